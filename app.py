@@ -1,14 +1,15 @@
 import streamlit as st
 import os
+import html
 from datetime import datetime
 import json
 
 # Internal imports
 from auth import authenticate_user, create_user, logout_user
 from workspace import load_workspaces, create_workspace
-from dashboard import get_user_dashboards
-from data_manager import load_data_source
 from config import APP_NAME, APP_VERSION, DB_PATH, LOGO_PATH
+# dashboard and data_manager pull in pandas and the charting stack; they are
+# imported by the pages that use them so the login screen renders without them
 
 # Page config
 st.set_page_config(
@@ -18,9 +19,47 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Load custom CSS
-with open("assets/css/style.css") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "css", "style.css")
+# Streamlit serves <app dir>/static at app/static/ when server.enableStaticServing is on
+EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "exports")
+EXPORT_TTL = 3600
+
+# Load custom CSS once per process
+@st.cache_resource
+def load_css():
+    with open(CSS_PATH) as f:
+        return f"<style>{f.read()}</style>"
+
+st.markdown(load_css(), unsafe_allow_html=True)
+
+# One handle per process on the cross-process dataset store
+@st.cache_resource
+def get_shared_store():
+    from shared_store import SharedDatasetStore
+    return SharedDatasetStore()
+
+# Sharing is only an optimization: if the store fails for any reason the session
+# keeps its private copy instead of losing the upload
+def attach_shared(key):
+    try:
+        return get_shared_store().attach(key)
+    except Exception as e:
+        print(f"[STORE ERROR] attach '{key}': {e}")
+        return None
+
+def publish_shared(key, df):
+    try:
+        return get_shared_store().publish(key, df)
+    except Exception as e:
+        print(f"[STORE ERROR] publish '{key}': {e}")
+        return None
+
+# File source served straight from the shared store, without parsing the upload
+class SharedFileSource:
+    def __init__(self, data, shared_key):
+        self.type = "file"
+        self.data = data
+        self.shared_key = shared_key
 
 # Initialize session state
 if "authenticated" not in st.session_state:
@@ -37,6 +76,10 @@ if "current_dashboard" not in st.session_state:
     st.session_state.current_dashboard = None
 if "data_sources" not in st.session_state:
     st.session_state.data_sources = {}
+if "transform_plans" not in st.session_state:
+    st.session_state.transform_plans = {}
+if "upload_key" not in st.session_state:
+    st.session_state.upload_key = (None, None)
 
 # App header with logo
 def render_header():
@@ -142,6 +185,8 @@ def render_auth_forms():
 
 # Data sources page
 def render_data_sources():
+    from data_manager import load_data_source
+
     st.header("📂 Data Sources")
     
     # Data source options
@@ -154,7 +199,27 @@ def render_data_sources():
         file = st.file_uploader("Upload file", type=["csv", "xlsx", "json"])
         if file is not None:
             try:
-                data_source = load_data_source(file, source_type)
+                from shared_store import dataset_key
+
+                # Hash the upload once per file, not on every rerun of the page
+                file_id, key = st.session_state.upload_key
+                if file_id != file.file_id:
+                    key = dataset_key(file.name, file.getvalue())
+                    st.session_state.upload_key = (file.file_id, key)
+                data_source = st.session_state.data_sources.get(file.name)
+                if getattr(data_source, "shared_key", None) != key:
+                    # Parse only when no process has published this exact file yet
+                    shared = attach_shared(key)
+                    if shared is not None:
+                        data_source = SharedFileSource(shared, key)
+                    else:
+                        data_source = load_data_source(file, source_type)
+                        if data_source:
+                            # Swap the private frame for the shared, memory-mapped copy when possible
+                            shared = publish_shared(key, data_source.data)
+                            if shared is not None:
+                                data_source.data = shared
+                            data_source.shared_key = key
                 if data_source:
                     st.session_state.data_sources[file.name] = data_source
                     st.success(f"Successfully loaded: {file.name}")
@@ -210,6 +275,143 @@ def render_data_sources():
         for name, source in st.session_state.data_sources.items():
             st.markdown(f"**{name}** - {source.type}")
 
+# Transform pipeline builder; plans are kept as JSON-able dicts per source/table
+def _reject_constant(name):
+    raise ValueError(name)
+
+def parse_step_value(text):
+    # NaN / Infinity are kept as text; filters only accept finite numbers
+    try:
+        return json.loads(text, parse_constant=_reject_constant)
+    except ValueError:
+        return text
+
+def render_transform_builder(plan_key, columns):
+    from transforms import TransformPlan, FILTER_OPS, CAST_TYPES, AGG_FUNCS
+
+    plan = TransformPlan.from_dict(st.session_state.transform_plans.get(plan_key, {}))
+    columns = list(columns) + [step["name"] for step in plan.steps if step["op"] == "derive"]
+
+    step_type = st.selectbox(
+        "Add Step",
+        ["Filter", "Select Columns", "Derive Column", "Cast Type", "Fill Nulls",
+         "Drop Nulls", "Remove Duplicates", "Group & Aggregate"],
+        key=f"{plan_key}_step_type"
+    )
+
+    new_plan = None
+    if step_type == "Filter":
+        column = st.selectbox("Column", columns, key=f"{plan_key}_filter_column")
+        op = st.selectbox("Operator", FILTER_OPS, key=f"{plan_key}_filter_op")
+        value = None
+        if op in ("in", "not in"):
+            raw = st.text_input("Values (comma separated)", key=f"{plan_key}_filter_values")
+            value = [parse_step_value(v.strip()) for v in raw.split(",") if v.strip()]
+        elif op not in ("is null", "not null"):
+            value = parse_step_value(st.text_input("Value", key=f"{plan_key}_filter_value"))
+        if st.button("Add Filter", key=f"{plan_key}_add_filter"):
+            new_plan = plan.filter(column, op, value)
+    elif step_type == "Select Columns":
+        selected = st.multiselect("Columns", columns, key=f"{plan_key}_select_columns")
+        if st.button("Add Selection", key=f"{plan_key}_add_select") and selected:
+            new_plan = plan.select(selected)
+    elif step_type == "Derive Column":
+        name = st.text_input("New Column Name", key=f"{plan_key}_derive_name")
+        expression = st.text_input("Expression (e.g. price * quantity)", key=f"{plan_key}_derive_expr")
+        if st.button("Add Column", key=f"{plan_key}_add_derive") and name and expression:
+            new_plan = plan.derive(name, expression)
+    elif step_type == "Cast Type":
+        column = st.selectbox("Column", columns, key=f"{plan_key}_cast_column")
+        dtype = st.selectbox("Type", CAST_TYPES, key=f"{plan_key}_cast_type")
+        if st.button("Add Cast", key=f"{plan_key}_add_cast"):
+            new_plan = plan.cast(column, dtype)
+    elif step_type == "Fill Nulls":
+        selected = st.multiselect("Columns (empty for all)", columns, key=f"{plan_key}_fill_columns")
+        value = parse_step_value(st.text_input("Fill Value", "0", key=f"{plan_key}_fill_value"))
+        if st.button("Add Fill", key=f"{plan_key}_add_fill"):
+            new_plan = plan.fill_nulls(value, selected)
+    elif step_type == "Drop Nulls":
+        selected = st.multiselect("Columns (empty for any)", columns, key=f"{plan_key}_drop_columns")
+        if st.button("Add Drop", key=f"{plan_key}_add_drop"):
+            new_plan = plan.drop_nulls(selected)
+    elif step_type == "Remove Duplicates":
+        selected = st.multiselect("Columns (empty for whole row)", columns, key=f"{plan_key}_dedupe_columns")
+        if st.button("Add Dedupe", key=f"{plan_key}_add_dedupe"):
+            new_plan = plan.dedupe(selected)
+    elif step_type == "Group & Aggregate":
+        by = st.multiselect("Group By", columns, key=f"{plan_key}_group_by")
+        column = st.selectbox("Aggregate Column", columns, key=f"{plan_key}_agg_column")
+        func = st.selectbox("Function", AGG_FUNCS, key=f"{plan_key}_agg_func")
+        if st.button("Add Aggregation", key=f"{plan_key}_add_group") and by:
+            new_plan = plan.group_aggregate(by, {f"{column}_{func}": [column, func]})
+
+    if new_plan is not None:
+        st.session_state.transform_plans[plan_key] = new_plan.to_dict()
+        st.rerun()
+
+    if len(plan):
+        st.json(plan.steps)
+        if st.button("Clear Steps", key=f"{plan_key}_clear"):
+            st.session_state.transform_plans.pop(plan_key, None)
+            st.rerun()
+    return plan
+
+# Export section; make_chunks returns a fresh iterator of DataFrame chunks
+def render_export(export_key, base_name, make_chunks, total_rows=None):
+    from exporter import EXPORT_FORMATS, export_file_name, export_to_temp_file, prune_exports
+
+    col1, col2 = st.columns(2)
+    with col1:
+        fmt = st.selectbox("Format", list(EXPORT_FORMATS), key=f"{export_key}_export_format")
+    with col2:
+        use_gzip = st.checkbox("Gzip Compression", key=f"{export_key}_export_gzip", disabled=fmt == "Excel")
+    compression = "gzip" if use_gzip and fmt != "Excel" else None
+
+    if st.button("Prepare Download", key=f"{export_key}_export_prepare"):
+        bar = st.progress(0.0, text="Exporting...")
+
+        def report(rows, total):
+            if total:
+                bar.progress(min(rows / total, 1.0), text=f"Exported {rows:,} of {total:,} rows")
+            else:
+                bar.progress(0.0, text=f"Exported {rows:,} rows")
+
+        serve_from_disk = st.get_option("server.enableStaticServing")
+        directory = None
+        if serve_from_disk:
+            os.makedirs(EXPORT_DIR, exist_ok=True)
+            prune_exports(EXPORT_DIR, EXPORT_TTL)
+            directory = EXPORT_DIR
+        try:
+            path, rows = export_to_temp_file(make_chunks(), fmt, compression, report, total_rows, directory)
+        except Exception as e:
+            st.error(f"Export error: {str(e)}")
+            return
+        bar.progress(1.0, text=f"Exported {rows:,} rows")
+        file_name = export_file_name(base_name, fmt, compression)
+        if serve_from_disk:
+            # The browser fetches the file from the static handler, which streams it from
+            # disk; nothing is copied into Streamlit's in-memory media store.
+            # prune_exports removes it after EXPORT_TTL
+            st.markdown(
+                f'<a href="app/static/exports/{os.path.basename(path)}" download="{html.escape(file_name)}">'
+                f'⬇️ Download {html.escape(file_name)}</a>',
+                unsafe_allow_html=True
+            )
+            return
+        try:
+            # Without static serving the button has to read the whole file into memory
+            with open(path, "rb") as f:
+                st.download_button(
+                    "⬇️ Download",
+                    data=f,
+                    file_name=file_name,
+                    mime="application/gzip" if compression and fmt == "CSV" else EXPORT_FORMATS[fmt]["mime"],
+                    key=f"{export_key}_export_download"
+                )
+        finally:
+            os.remove(path)
+
 # Data explorer page
 def render_data_explorer():
     st.header("🔍 Data Explorer")
@@ -224,25 +426,46 @@ def render_data_explorer():
     
     # Display options based on source type
     if data_source.type == "file":
-        st.dataframe(data_source.data)
+        with st.expander("Transform Pipeline"):
+            plan = render_transform_builder(source_name, data_source.data.columns)
+
+        # The plan runs once per rerun; the table, analysis and charts all use its result
+        view = data_source.data
+        transform_failed = False
+        if len(plan):
+            try:
+                view = plan.execute(data_source.data)
+            except Exception as e:
+                st.error(f"Transform error: {str(e)}")
+                transform_failed = True
+        st.dataframe(view)
+
+        with st.expander("Export Data"):
+            from exporter import iter_frame_chunks
+
+            if transform_failed:
+                st.warning("Fix the transform pipeline before exporting.")
+            else:
+                # Slices of the already-transformed frame; the plan does not run again
+                render_export(source_name, source_name, lambda: iter_frame_chunks(view), total_rows=len(view))
         
         # Data analysis options
         with st.expander("Data Analysis"):
             col1, col2 = st.columns(2)
             with col1:
                 if st.button("Generate Summary Statistics"):
-                    st.write(data_source.data.describe())
+                    st.write(view.describe())
             with col2:
                 if st.button("Check Missing Values"):
-                    st.write(data_source.data.isnull().sum())
+                    st.write(view.isnull().sum())
         
         # Visualization options
         with st.expander("Quick Visualizations"):
             viz_type = st.selectbox("Chart Type", ["Bar Chart", "Line Chart", "Scatter Plot", "Histogram"])
             
             if viz_type == "Bar Chart":
-                x_col = st.selectbox("X-axis", data_source.data.columns)
-                y_col = st.selectbox("Y-axis", data_source.data.columns)
+                x_col = st.selectbox("X-axis", view.columns)
+                y_col = st.selectbox("Y-axis", view.columns)
                 # Code for bar chart visualization would go here
             
             # Other visualization options would follow
@@ -262,12 +485,41 @@ def render_data_explorer():
                     except Exception as e:
                         st.error(f"Query error: {str(e)}")
             else:
-                # Simple table view
-                df = data_source.get_table_data(selected_table)
-                st.dataframe(df)
+                from transforms import TransformPlan
+
+                dialect = getattr(data_source, "db_type", "SQLite")
+                with st.expander("Transform Pipeline"):
+                    # LIMIT 0 fetches the column names without reading any rows
+                    empty, _ = TransformPlan().to_sql(selected_table, dialect)
+                    columns = data_source.execute_query(f"{empty} LIMIT 0").columns
+                    plan = render_transform_builder(f"{source_name}.{selected_table}", columns)
+
+                if len(plan):
+                    # Leading filters and column selections are pushed into the query
+                    try:
+                        st.dataframe(plan.run_on_database(data_source, selected_table, dialect))
+                    except Exception as e:
+                        st.error(f"Transform error: {str(e)}")
+                else:
+                    # Simple table view
+                    df = data_source.get_table_data(selected_table)
+                    st.dataframe(df)
+
+                with st.expander("Export Data"):
+                    from exporter import iter_plan_chunks, iter_query_chunks
+
+                    # Export streams from the database instead of reusing the displayed frame
+                    query, remaining = plan.to_sql(selected_table, dialect)
+                    render_export(
+                        f"{source_name}.{selected_table}",
+                        f"{source_name}_{selected_table}",
+                        lambda: iter_plan_chunks(iter_query_chunks(data_source, query), remaining)
+                    )
 
 # Dashboards page
 def render_dashboards():
+    from dashboard import get_user_dashboards
+
     st.header("📊 Dashboards")
     
     if st.session_state.current_workspace is None:
@@ -0,0 +1,36 @@
+import argparse
+import sys
+
+from benchmarks import bench_db, bench_sessions, bench_startup, bench_upload, bench_write_queue
+from benchmarks.common import write_results
+
+SUITES = {
+    "db": bench_db.run,
+    "upload": bench_upload.run,
+    "sessions": bench_sessions.run,
+    "startup": bench_startup.run,
+    "write_queue": bench_write_queue.run,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the DataSage performance suite")
+    parser.add_argument("suites", nargs="*", choices=sorted(SUITES), default=[])
+    parser.add_argument("--out-dir", default=None)
+    args = parser.parse_args()
+
+    failed = []
+    for name in args.suites or SUITES:
+        print(f"[BENCH] Running {name} suite...")
+        try:
+            results, params = SUITES[name]()
+        except RuntimeError as e:
+            # A suite refuses to report partial results; skip it and fail the run
+            print(f"[BENCH ERROR] {name}: {e}")
+            failed.append(name)
+            continue
+        write_results(name, results, params, out_dir=args.out_dir)
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
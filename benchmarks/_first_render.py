@@ -0,0 +1,35 @@
+import time
+
+PROCESS_START = time.perf_counter()
+
+import json
+import sys
+
+# Runs in a fresh interpreter under -X importtime; prints one JSON line on stdout
+def main():
+    script = sys.argv[1]
+    from streamlit.testing.v1 import AppTest
+    imported = time.perf_counter()
+
+    at = AppTest.from_file(script, default_timeout=60)
+    at.run()
+    first_render = time.perf_counter()
+
+    at.run()
+    warm_rerun = time.perf_counter()
+
+    AppTest.from_file(script, default_timeout=60).run()
+    second_session = time.perf_counter()
+
+    print(json.dumps({
+        "import_harness_ms": (imported - PROCESS_START) * 1000.0,
+        "time_to_first_render_ms": (first_render - PROCESS_START) * 1000.0,
+        "first_script_run_ms": (first_render - imported) * 1000.0,
+        "warm_rerun_ms": (warm_rerun - first_render) * 1000.0,
+        "second_session_ms": (second_session - warm_rerun) * 1000.0,
+        "exceptions": [str(e.message) for e in at.exception],
+        "modules": sorted(sys.modules),
+    }))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import inspect
+import itertools
+import os
+import random
+import tempfile
+
+import db
+from benchmarks.common import quiet, time_call, write_results
+from benchmarks.datagen import build_profile, create_seeded_database
+
+# === CASES ===
+
+def build_cases(conn, db_file, ids, seed=42):
+    rng = random.Random(seed)
+    counter = itertools.count()
+    user_ids = ids["user_ids"]
+    workspace_ids = ids["workspace_ids"]
+    dashboard_ids = ids["dashboard_ids"]
+    element_ids = ids["element_ids"]
+
+    def doomed_dashboard():
+        # delete_dashboard needs a fresh row per call, created outside the timed region
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO dashboards (name, user_id, workspace_id) VALUES (?, ?, ?)",
+                       (f"doomed_{next(counter)}", rng.choice(user_ids), rng.choice(workspace_ids)))
+        conn.commit()
+        return cursor.lastrowid
+
+    def connect_and_close():
+        db.create_connection(db_file).close()
+
+    # Each case is (setup, call); setup runs outside the timer and feeds call its argument
+    return {
+        "create_connection": (None, connect_and_close),
+        "execute_query": (None, lambda: db.execute_query(conn, "UPDATE users SET role = role WHERE id = 1", "bench")),
+        "create_user_table": (None, lambda: db.create_user_table(conn)),
+        "check_user": (None, lambda: db.check_user(conn, f"user_{rng.randrange(len(user_ids))}", "pw_0")),
+        "add_user": (None, lambda: db.add_user(conn, f"bench_user_{next(counter)}", "secret")),
+        "get_user_by_username": (None, lambda: db.get_user_by_username(conn, f"user_{rng.randrange(len(user_ids))}")),
+        "create_workspace_table": (None, lambda: db.create_workspace_table(conn)),
+        "create_workspace": (None, lambda: db.create_workspace(conn, f"bench_ws_{next(counter)}")),
+        "add_user_to_workspace": (None, lambda: db.add_user_to_workspace(conn, rng.choice(user_ids), rng.choice(workspace_ids))),
+        "get_user_workspaces": (None, lambda: db.get_user_workspaces(conn, rng.choice(user_ids))),
+        "create_dashboard_tables": (None, lambda: db.create_dashboard_tables(conn)),
+        "create_dashboard_sharing_and_history": (None, lambda: db.create_dashboard_sharing_and_history(conn)),
+        "create_comments_table": (None, lambda: db.create_comments_table(conn)),
+        "initialize_database": (None, lambda: db.initialize_database(conn)),
+        "save_dashboard_element": (None, lambda: db.save_dashboard_element(
+            conn, rng.choice(dashboard_ids), "bar_chart", {"x": "col_a", "y": "col_b"}, {"title": "bench"})),
+        "get_user_dashboards": (None, lambda: db.get_user_dashboards(conn, rng.choice(user_ids), rng.choice(workspace_ids))),
+        "get_dashboard_elements": (None, lambda: db.get_dashboard_elements(conn, rng.choice(dashboard_ids))),
+        "delete_dashboard": (doomed_dashboard, lambda dashboard_id: db.delete_dashboard(conn, dashboard_id)),
+        "save_dashboard": (None, lambda: db.save_dashboard(conn, f"bench_dash_{next(counter)}",
+                                                          rng.choice(user_ids), rng.choice(workspace_ids))),
+        "load_dashboard": (None, lambda: db.load_dashboard(conn, rng.choice(dashboard_ids))),
+        "add_comment": (None, lambda: db.add_comment(conn, rng.choice(element_ids), rng.choice(user_ids), "bench")),
+        "get_element_comments": (None, lambda: db.get_element_comments(conn, rng.choice(element_ids))),
+        "share_dashboard": (None, lambda: db.share_dashboard(conn, rng.choice(dashboard_ids), rng.choice(user_ids))),
+        "get_dashboard_shares": (None, lambda: db.get_dashboard_shares(conn, rng.choice(dashboard_ids))),
+        "add_dashboard_history": (None, lambda: db.add_dashboard_history(conn, rng.choice(dashboard_ids), {"bench": True})),
+        "get_dashboard_history": (None, lambda: db.get_dashboard_history(conn, rng.choice(dashboard_ids))),
+    }
+
+def db_functions():
+    return sorted(name for name, obj in inspect.getmembers(db, inspect.isfunction)
+                  if obj.__module__ == db.__name__ and not name.startswith("_"))
+
+# === RUN ===
+
+def run(scale=1.0, repeat=200, seed=42):
+    profile = build_profile(scale)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        conn, ids = create_seeded_database(db_file, profile, seed=seed)
+        cases = build_cases(conn, db_file, ids, seed=seed)
+
+        results = {}
+        with quiet():
+            for name, (setup, call) in cases.items():
+                results[name] = time_call(call, repeat=repeat, setup=setup)
+        conn.close()
+
+    missing = [name for name in db_functions() if name not in cases]
+    for name, stats in results.items():
+        print(f"[BENCH] db.{name}: median {stats['median_ms']:.3f} ms, p99 {stats['p99_ms']:.3f} ms")
+    if missing:
+        print(f"[BENCH WARNING] No benchmark case for: {', '.join(missing)}")
+    return {"functions": results, "missing_cases": missing}, {"scale": scale, "repeat": repeat, "seed": seed,
+                                                                "profile": profile}
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark every db.py function")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out-dir", default=None)
+    args = parser.parse_args()
+
+    results, params = run(scale=args.scale, repeat=args.repeat, seed=args.seed)
+    write_results("db", results, params, out_dir=args.out_dir)
+
+if __name__ == "__main__":
+    main()
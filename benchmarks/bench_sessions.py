@@ -0,0 +1,138 @@
+import argparse
+import os
+import multiprocessing
+import queue
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.common import REPO_ROOT, quiet, summarize, write_results
+from benchmarks.datagen import build_profile, create_seeded_database
+
+# === SESSION SCRIPT ===
+
+# Each simulated user runs in its own process: AppTest instances sharing one
+# interpreter contend for the same script runner and time out under load, which
+# would leave only the surviving sessions in the figures.
+
+def simulate_session(script, user_index, reruns, barrier, results):
+    timings = {"first_render": [], "login": [], "rerun": []}
+    errors = []
+    try:
+        with quiet():
+            from streamlit.testing.v1 import AppTest
+
+            # Start every session together, after the interpreter and streamlit are loaded
+            barrier.wait()
+            at = AppTest.from_file(script, default_timeout=60)
+
+            start = time.perf_counter()
+            at.run()
+            timings["first_render"].append(time.perf_counter() - start)
+
+            at.text_input[0].input(f"user_{user_index}")
+            at.text_input[1].input(f"pw_{user_index}")
+            start = time.perf_counter()
+            at.button[0].click().run()
+            timings["login"].append(time.perf_counter() - start)
+
+            for _ in range(reruns):
+                start = time.perf_counter()
+                at.run()
+                timings["rerun"].append(time.perf_counter() - start)
+
+        if at.exception:
+            errors.append(str(at.exception[0].message))
+    except Exception as e:
+        errors.append(repr(e))
+        # Release the other sessions (and the parent) if we failed before the barrier
+        barrier.abort()
+    results.put((user_index, timings, errors))
+
+def run_users(script, users, reruns, timeout=600):
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(users + 1)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=simulate_session, args=(script, i, reruns, barrier, results))
+        for i in range(users)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        barrier.wait(timeout)
+    except threading.BrokenBarrierError:
+        pass
+    start = time.perf_counter()
+
+    timings = {"first_render": [], "login": [], "rerun": []}
+    errors = []
+    for _ in processes:
+        try:
+            user_index, session_timings, session_errors = results.get(timeout=timeout)
+        except queue.Empty:
+            errors.append("session did not report back before the timeout")
+            break
+        for phase, samples in session_timings.items():
+            timings[phase].extend(samples)
+        errors.extend(f"user_{user_index}: {e}" for e in session_errors)
+    wall = time.perf_counter() - start
+    for process in processes:
+        process.join(10)
+        if process.is_alive():
+            process.terminate()
+
+    result = {phase: summarize(samples) for phase, samples in timings.items()}
+    result["wall_s"] = wall
+    result["errors"] = errors
+    return result
+
+# === RUN ===
+
+def run(user_counts=(1, 4, 16), reruns=10, scale=1.0, script="main.py", seed=42):
+    profile = build_profile(scale)
+    profile["users"] = max(profile["users"], max(user_counts))
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # main.py resolves datasage.db against the working directory
+        conn, _ = create_seeded_database(os.path.join(tmp, "datasage.db"), profile, seed=seed)
+        conn.close()
+        os.chdir(tmp)
+        try:
+            for users in user_counts:
+                with quiet():
+                    result = run_users(os.path.join(REPO_ROOT, script), users, reruns)
+                results[f"users_{users}"] = result
+                print(f"[BENCH] {users} sessions: rerun median {result['rerun']['median_ms']:.1f} ms, "
+                      f"p99 {result['rerun']['p99_ms']:.1f} ms, errors {len(result['errors'])}")
+        finally:
+            os.chdir(cwd)
+
+    # Figures from a partial set of sessions would understate the load, so refuse them
+    errors = [f"{key}: {e}" for key, result in results.items() for e in result["errors"]]
+    if errors:
+        raise RuntimeError("Session benchmark had failing sessions; no results written:\n" + "\n".join(errors))
+    return results, {"user_counts": list(user_counts), "reruns": reruns, "scale": scale,
+                     "script": script, "seed": seed}
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Streamlit rerun latency under concurrent sessions")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--script", default="main.py")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out-dir", default=None)
+    args = parser.parse_args()
+
+    try:
+        results, params = run(args.users, args.reruns, args.scale, args.script, args.seed)
+    except RuntimeError as e:
+        print(f"[BENCH ERROR] {e}")
+        sys.exit(1)
+    write_results("sessions", results, params, out_dir=args.out_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import REPO_ROOT, summarize, write_results
+
+# Libraries from requirements.txt that should stay out of the first render
+HEAVY_MODULES = ["pandas", "plotly", "sweetviz", "sklearn", "psycopg2", "mysql", "sqlalchemy", "openpyxl"]
+
+# === IMPORTTIME ===
+
+def parse_importtime(stderr):
+    # Lines look like "import time:       123 |       4567 |   package.sub";
+    # nesting depth is encoded as leading spaces in the package column
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = {
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "top_level": not name[1:].startswith(" "),
+        }
+    return modules
+
+def top_imports(modules, limit=15):
+    ranked = sorted(((name, info["cumulative_us"]) for name, info in modules.items() if info["top_level"]),
+                    key=lambda item: item[1], reverse=True)
+    return [{"module": name, "cumulative_ms": us / 1000.0} for name, us in ranked[:limit]]
+
+# === RUN ===
+
+def measure_once(script, workdir):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "benchmarks._first_render", script],
+        cwd=workdir, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", "")},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Startup probe failed:\n{proc.stderr[-2000:]}")
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+    report["importtime"] = parse_importtime(proc.stderr)
+    return report
+
+def run(script="main.py", repeat=5):
+    script_path = os.path.join(REPO_ROOT, script)
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # Run from a scratch directory so the probe never touches a developer's datasage.db
+        for _ in range(repeat):
+            runs.append(measure_once(script_path, tmp))
+
+    last = runs[-1]
+    loaded = set(last["modules"])
+    results = {
+        metric: summarize([r[metric] / 1000.0 for r in runs])
+        for metric in ("import_harness_ms", "time_to_first_render_ms", "first_script_run_ms",
+                       "warm_rerun_ms", "second_session_ms")
+    }
+    results["heavy_modules_loaded"] = [name for name in HEAVY_MODULES if name in loaded]
+    results["top_imports"] = top_imports(last["importtime"])
+    results["exceptions"] = last["exceptions"]
+
+    print(f"[BENCH] {script}: time to first render median "
+          f"{results['time_to_first_render_ms']['median_ms']:.0f} ms, "
+          f"warm rerun {results['warm_rerun_ms']['median_ms']:.1f} ms")
+    for entry in results["top_imports"][:5]:
+        print(f"[BENCH]   {entry['module']}: {entry['cumulative_ms']:.1f} ms")
+    if results["heavy_modules_loaded"]:
+        print(f"[BENCH WARNING] Loaded at startup: {', '.join(results['heavy_modules_loaded'])}")
+    return results, {"script": script, "repeat": repeat}
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start and time to first render")
+    parser.add_argument("--script", default="main.py")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out-dir", default=None)
+    args = parser.parse_args()
+
+    results, params = run(args.script, args.repeat)
+    write_results("startup", results, params, out_dir=args.out_dir)
+
+if __name__ == "__main__":
+    main()
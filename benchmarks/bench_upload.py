@@ -0,0 +1,73 @@
+import argparse
+import io
+import time
+import tracemalloc
+
+from benchmarks.common import summarize, write_results
+from benchmarks.datagen import make_frame, make_upload_bytes
+
+FORMATS = ["csv", "xlsx", "json"]
+
+# Mirrors what the app does with an uploaded file: parse the raw bytes into a DataFrame
+def parse_upload(raw, fmt):
+    import pandas as pd
+
+    buffer = io.BytesIO(raw)
+    if fmt == "csv":
+        return pd.read_csv(buffer)
+    if fmt == "xlsx":
+        return pd.read_excel(buffer)
+    if fmt == "json":
+        return pd.read_json(buffer, orient="records")
+    raise ValueError(f"Unsupported format: {fmt}")
+
+def measure(raw, fmt, repeat):
+    # Timing pass: tracemalloc hooks every allocation and would inflate parse times
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = parse_upload(raw, fmt)
+        samples.append(time.perf_counter() - start)
+        del df
+
+    # Memory pass: a separate, untimed parse under tracemalloc
+    tracemalloc.start()
+    df = parse_upload(raw, fmt)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    stats = summarize(samples)
+    stats.update({
+        "rows": len(df),
+        "file_bytes": len(raw),
+        "frame_bytes": int(df.memory_usage(deep=True).sum()),
+        "peak_alloc_bytes": peak,
+    })
+    return stats
+
+def run(sizes=(1_000, 10_000, 100_000), formats=FORMATS, repeat=5, seed=42):
+    results = {}
+    for rows in sizes:
+        df = make_frame(rows, seed=seed)
+        for fmt in formats:
+            raw = make_upload_bytes(df, fmt)
+            stats = measure(raw, fmt, repeat)
+            results[f"{fmt}_{rows}"] = stats
+            print(f"[BENCH] parse {fmt} x{rows}: median {stats['median_ms']:.1f} ms, "
+                  f"peak {stats['peak_alloc_bytes'] / 1e6:.1f} MB")
+    return results, {"sizes": list(sizes), "formats": list(formats), "repeat": repeat, "seed": seed}
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure upload parse time and memory per file format")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=FORMATS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out-dir", default=None)
+    args = parser.parse_args()
+
+    results, params = run(args.sizes, args.formats, args.repeat, args.seed)
+    write_results("upload", results, params, out_dir=args.out_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import db
+from benchmarks.common import quiet, summarize, write_results
+from benchmarks.datagen import build_profile, create_seeded_database
+from write_queue import WriteBehindQueue
+
+# Compares posting comments with a commit per call (what db.py does by default)
+# against handing them to the write-behind queue. Latency is what the posting
+# thread sees; throughput includes the final flush, so queued writes are durable.
+
+def post_comments(db_file, element_ids, user_id, count, latencies, waits, barrier, write_queue=None):
+    # Each session has its own connection, as in main.py
+    session_id = f"session_{user_id}"
+    conn = db.create_connection(db_file)
+    barrier.wait()
+    for i in range(count):
+        start = time.perf_counter()
+        db.add_comment(conn, element_ids[i % len(element_ids)], user_id, f"bench comment {i}",
+                       write_queue=write_queue, session_id=session_id)
+        latencies.append(time.perf_counter() - start)
+    if write_queue is not None:
+        # Read-your-writes: the session's comments are visible once this returns
+        start = time.perf_counter()
+        write_queue.wait_for(session_id)
+        waits.append(time.perf_counter() - start)
+    conn.close()
+
+def run_mode(db_file, ids, sessions, comments, use_queue, batch_size, flush_interval):
+    write_queue = WriteBehindQueue(db_file, batch_size=batch_size, flush_interval=flush_interval) if use_queue else None
+    latencies = []
+    waits = []
+    barrier = threading.Barrier(sessions + 1)
+    threads = [
+        threading.Thread(target=post_comments,
+                         args=(db_file, ids["element_ids"], ids["user_ids"][i], comments, latencies, waits,
+                               barrier, write_queue))
+        for i in range(sessions)
+    ]
+    with quiet():
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        if write_queue is not None:
+            write_queue.flush()
+        elapsed = time.perf_counter() - start
+        if write_queue is not None:
+            write_queue.close()
+
+    with quiet():
+        conn = db.create_connection(db_file)
+    written = conn.execute("SELECT COUNT(*) FROM comments WHERE comment_text LIKE 'bench comment %'").fetchone()[0]
+    conn.close()
+    result = summarize(latencies)
+    result.update({
+        "comments": sessions * comments,
+        "committed": written,
+        "elapsed_s": elapsed,
+        "throughput_per_s": sessions * comments / elapsed if elapsed else 0.0,
+        "errors": len(write_queue.errors) if write_queue is not None else 0,
+    })
+    if waits:
+        result["read_your_writes_wait"] = summarize(waits)
+    return result
+
+def run(sessions=8, comments=200, scale=1.0, batch_size=500, flush_interval=0.05, seed=42):
+    profile = build_profile(scale)
+    results = {}
+    for mode, use_queue in (("per_call_commit", False), ("write_behind", True)):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_file = os.path.join(tmp, "bench.db")
+            conn, ids = create_seeded_database(db_file, profile, seed=seed)
+            conn.close()
+            results[mode] = run_mode(db_file, ids, sessions, comments, use_queue, batch_size, flush_interval)
+        r = results[mode]
+        print(f"[BENCH] {mode}: {r['throughput_per_s']:.0f} comments/s, "
+              f"p99 {r['p99_ms']:.3f} ms, committed {r['committed']}/{r['comments']}")
+    return results, {"sessions": sessions, "comments": comments, "scale": scale, "batch_size": batch_size,
+                     "flush_interval": flush_interval, "seed": seed}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-call commits with the write-behind queue")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--comments", type=int, default=200)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--flush-interval", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out-dir", default=None)
+    args = parser.parse_args()
+
+    results, params = run(args.sessions, args.comments, args.scale, args.batch_size, args.flush_interval, args.seed)
+    write_results("write_queue", results, params, out_dir=args.out_dir)
+
+if __name__ == "__main__":
+    main()
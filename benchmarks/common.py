@@ -0,0 +1,85 @@
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# === TIMING ===
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+def summarize(samples):
+    # All timings are reported in milliseconds
+    ms = [s * 1000.0 for s in samples]
+    return {
+        "runs": len(ms),
+        "min_ms": min(ms) if ms else 0.0,
+        "mean_ms": statistics.fmean(ms) if ms else 0.0,
+        "median_ms": statistics.median(ms) if ms else 0.0,
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+        "max_ms": max(ms) if ms else 0.0,
+    }
+
+def time_call(fn, repeat=50, warmup=3, setup=None):
+    # With a setup callable, its return value is passed to fn and kept out of the timing
+    def once():
+        args = () if setup is None else (setup(),)
+        start = time.perf_counter()
+        fn(*args)
+        return time.perf_counter() - start
+
+    for _ in range(warmup):
+        once()
+    return summarize([once() for _ in range(repeat)])
+
+@contextlib.contextmanager
+def quiet():
+    # db.py reports every call with print(); keep it out of the measurements
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+# === RESULTS ===
+
+def git_revision():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except Exception:
+        return None
+
+def write_results(name, results, params=None, out_dir=None):
+    out_dir = out_dir or RESULTS_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    payload = {
+        "benchmark": name,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "params": params or {},
+        "results": results,
+    }
+    path = os.path.join(out_dir, f"{name}.json")
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    print(f"[BENCH] {name} results written to {path}")
+    return path
@@ -0,0 +1,59 @@
+import argparse
+import json
+import sys
+
+# Only these metrics gate a release; means and maxima are too noisy to compare run-to-run
+TRACKED_METRICS = ("median_ms", "p99_ms", "peak_alloc_bytes")
+
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        elif isinstance(value, (int, float)) and key in TRACKED_METRICS:
+            flat[path] = value
+    return flat
+
+def compare(baseline, current, threshold=0.2, min_delta_ms=0.05):
+    old = flatten(baseline["results"])
+    new = flatten(current["results"])
+    regressions = []
+    for path in sorted(old.keys() & new.keys()):
+        # Sub-tenth-of-a-millisecond swings are timer noise, not regressions
+        if path.endswith("_ms") and new[path] - old[path] < min_delta_ms:
+            continue
+        if old[path] > 0 and new[path] > old[path] * (1 + threshold):
+            regressions.append({
+                "metric": path,
+                "baseline": old[path],
+                "current": new[path],
+                "change": new[path] / old[path] - 1,
+            })
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed relative slowdown before a metric counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05,
+                        help="Ignore timing changes smaller than this many milliseconds")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    regressions = compare(baseline, current, args.threshold, args.min_delta_ms)
+    for r in regressions:
+        print(f"[REGRESSION] {r['metric']}: {r['baseline']:.3f} -> {r['current']:.3f} ({r['change']:+.0%})")
+    if regressions:
+        sys.exit(1)
+    print(f"[BENCH] No regressions above {args.threshold:.0%} "
+          f"({baseline.get('git_revision')} -> {current.get('git_revision')})")
+
+if __name__ == "__main__":
+    main()
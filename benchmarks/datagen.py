@@ -0,0 +1,153 @@
+import argparse
+import json
+import random
+
+from db import create_connection, initialize_database
+from benchmarks.common import quiet
+
+# Row counts at scale=1; every entity is multiplied by --scale
+BASE_PROFILE = {
+    "users": 100,
+    "workspaces": 10,
+    "dashboards": 50,
+    "elements_per_dashboard": 10,
+    "comments_per_element": 4,
+    "history_per_dashboard": 10,
+    "shares_per_dashboard": 3,
+}
+
+ELEMENT_TYPES = ["bar_chart", "line_chart", "scatter_plot", "histogram", "table", "kpi"]
+
+def build_profile(scale=1.0, **overrides):
+    profile = {}
+    for key, value in BASE_PROFILE.items():
+        if key.endswith("_per_dashboard") or key.endswith("_per_element"):
+            profile[key] = value
+        else:
+            profile[key] = max(1, int(value * scale))
+    profile.update({k: v for k, v in overrides.items() if v is not None})
+    return profile
+
+# === APP DATABASE ===
+
+def generate(conn, profile, seed=42):
+    rng = random.Random(seed)
+    cursor = conn.cursor()
+
+    users = [(f"user_{i}", f"pw_{i}", rng.choice(["viewer", "editor", "admin"]))
+             for i in range(profile["users"])]
+    cursor.executemany("INSERT INTO users (username, password, role) VALUES (?, ?, ?)", users)
+    user_ids = [row[0] for row in cursor.execute("SELECT id FROM users")]
+
+    cursor.executemany("INSERT INTO workspaces (name) VALUES (?)",
+                       [(f"workspace_{i}",) for i in range(profile["workspaces"])])
+    workspace_ids = [row[0] for row in cursor.execute("SELECT id FROM workspaces")]
+
+    memberships = set()
+    for user_id in user_ids:
+        for workspace_id in rng.sample(workspace_ids, min(3, len(workspace_ids))):
+            memberships.add((user_id, workspace_id, rng.choice(["viewer", "editor"])))
+    cursor.executemany("INSERT OR IGNORE INTO user_workspace (user_id, workspace_id, role) VALUES (?, ?, ?)",
+                       sorted(memberships))
+
+    cursor.executemany("INSERT INTO dashboards (name, user_id, workspace_id) VALUES (?, ?, ?)",
+                       [(f"dashboard_{i}", rng.choice(user_ids), rng.choice(workspace_ids))
+                        for i in range(profile["dashboards"])])
+    dashboard_ids = [row[0] for row in cursor.execute("SELECT id FROM dashboards")]
+
+    elements = []
+    for dashboard_id in dashboard_ids:
+        for i in range(profile["elements_per_dashboard"]):
+            element_data = {"source": f"source_{rng.randint(0, 20)}", "x": "col_a", "y": "col_b"}
+            settings = {"title": f"Element {i}", "width": rng.choice([4, 6, 12])}
+            elements.append((dashboard_id, rng.choice(ELEMENT_TYPES),
+                             json.dumps(element_data), json.dumps(settings)))
+    cursor.executemany("""
+        INSERT INTO dashboard_elements (dashboard_id, element_type, element_data, settings_json)
+        VALUES (?, ?, ?, ?)
+    """, elements)
+    element_ids = [row[0] for row in cursor.execute("SELECT id FROM dashboard_elements")]
+
+    cursor.executemany("INSERT INTO comments (element_id, user_id, comment_text) VALUES (?, ?, ?)",
+                       [(element_id, rng.choice(user_ids), f"comment {i} on element {element_id}")
+                        for element_id in element_ids
+                        for i in range(profile["comments_per_element"])])
+
+    cursor.executemany("""
+        INSERT INTO dashboard_history (dashboard_id, version_number, snapshot)
+        VALUES (?, ?, ?)
+    """, [(dashboard_id, version, json.dumps({"version": version, "elements": profile["elements_per_dashboard"]}))
+          for dashboard_id in dashboard_ids
+          for version in range(1, profile["history_per_dashboard"] + 1)])
+
+    shares = set()
+    for dashboard_id in dashboard_ids:
+        for user_id in rng.sample(user_ids, min(profile["shares_per_dashboard"], len(user_ids))):
+            shares.add((dashboard_id, user_id, rng.choice(["view", "edit"])))
+    cursor.executemany("""
+        INSERT OR IGNORE INTO dashboard_shares (dashboard_id, shared_with_user_id, permission)
+        VALUES (?, ?, ?)
+    """, sorted(shares))
+
+    conn.commit()
+    return {
+        "user_ids": user_ids,
+        "workspace_ids": workspace_ids,
+        "dashboard_ids": dashboard_ids,
+        "element_ids": element_ids,
+    }
+
+def create_seeded_database(db_file, profile, seed=42):
+    with quiet():
+        conn = create_connection(db_file)
+        initialize_database(conn)
+    ids = generate(conn, profile, seed=seed)
+    return conn, ids
+
+# === UPLOAD FILES ===
+
+def make_frame(rows, seed=42):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    categories = np.array(["north", "south", "east", "west", "central"])
+    return pd.DataFrame({
+        "id": np.arange(rows),
+        "region": categories[rng.integers(0, len(categories), rows)],
+        "amount": rng.normal(1000, 250, rows).round(2),
+        "quantity": rng.integers(1, 100, rows),
+        "ordered_at": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365 * 24, rows), unit="h"),
+        "note": np.where(rng.random(rows) < 0.1, None, "ok"),
+    })
+
+def make_upload_bytes(df, fmt):
+    import io
+
+    buffer = io.BytesIO()
+    if fmt == "csv":
+        df.to_csv(buffer, index=False)
+    elif fmt == "xlsx":
+        df.to_excel(buffer, index=False)
+    elif fmt == "json":
+        buffer.write(df.to_json(orient="records", date_format="iso").encode("utf-8"))
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+    return buffer.getvalue()
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic DataSage database")
+    parser.add_argument("db_file")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    for key in BASE_PROFILE:
+        parser.add_argument(f"--{key.replace('_', '-')}", type=int, dest=key)
+    args = parser.parse_args()
+
+    profile = build_profile(args.scale, **{k: getattr(args, k) for k in BASE_PROFILE})
+    conn, ids = create_seeded_database(args.db_file, profile, seed=args.seed)
+    conn.close()
+    print(f"[DATAGEN] {args.db_file}: " + ", ".join(f"{k}={len(v)}" for k, v in ids.items()))
+
+if __name__ == "__main__":
+    main()
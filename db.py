@@ -11,6 +11,15 @@ def create_connection(db_file):
         print(f"[DB ERROR] Connection failed: {e}")
         return None
 
+def _rollback(conn):
+    # A failed write leaves its implicit transaction open, and with it the SQLite write
+    # lock, for as long as the connection lives (a whole session in main.py)
+    try:
+        if conn is not None and conn.in_transaction:
+            conn.rollback()
+    except sqlite3.Error as e:
+        print(f"[DB ERROR] rollback: {e}")
+
 def execute_query(conn, query, label=""):
     try:
         cursor = conn.cursor()
@@ -19,6 +28,7 @@ def execute_query(conn, query, label=""):
         if label:
             print(f"{label} - Executed successfully.")
     except Exception as e:
+        _rollback(conn)
         print(f"[DB ERROR] {label}: {e}")
 
 # === USER FUNCTIONS ===
@@ -50,8 +60,10 @@ def add_user(conn, username, password, role="viewer"):
         conn.commit()
         print(f"[DB] User '{username}' added successfully with role '{role}'.")
     except sqlite3.IntegrityError:
+        _rollback(conn)
         print(f"[DB ERROR] Username '{username}' already exists.")
     except sqlite3.Error as e:
+        _rollback(conn)
         print(f"[DB ERROR] Failed to add user: {e}")
 
 def get_user_by_username(conn, username):
@@ -87,6 +99,7 @@ def create_workspace_table(conn):
         conn.commit()
         print("[DB] Workspace tables created.")
     except Exception as e:
+        _rollback(conn)
         print(f"[DB ERROR] create_workspace_table: {e}")
 
 def create_workspace(conn, name):
@@ -96,8 +109,10 @@ def create_workspace(conn, name):
         conn.commit()
         return cursor.lastrowid
     except sqlite3.IntegrityError:
+        _rollback(conn)
         print(f"[DB ERROR] Workspace '{name}' already exists.")
     except sqlite3.Error as e:
+        _rollback(conn)
         print(f"[DB ERROR] Failed to create workspace: {e}")
     return None
 
@@ -111,6 +126,7 @@ def add_user_to_workspace(conn, user_id, workspace_id, role="editor"):
         conn.commit()
         print(f"[DB] User {user_id} added to workspace {workspace_id} as {role}")
     except sqlite3.Error as e:
+        _rollback(conn)
         print(f"[DB ERROR] Failed to add user to workspace: {e}")
 
 def get_user_workspaces(conn, user_id):
@@ -220,6 +236,7 @@ def save_dashboard_element(conn, dashboard_id, element_type, element_data, setti
         conn.commit()
         print(f"[DB] Dashboard element saved successfully.")
     except sqlite3.Error as e:
+        _rollback(conn)
         print(f"[DB ERROR] save_dashboard_element: {e}")
 
 def get_user_dashboards(conn, user_id, workspace_id=None):
@@ -260,6 +277,7 @@ def delete_dashboard(conn, dashboard_id):
         conn.commit()
         print(f"[DB] Dashboard {dashboard_id} deleted successfully.")
     except sqlite3.Error as e:
+        _rollback(conn)
         print(f"[DB ERROR] delete_dashboard: {e}")
 
 def save_dashboard(conn, name, user_id, workspace_id):
@@ -273,6 +291,7 @@ def save_dashboard(conn, name, user_id, workspace_id):
         print(f"[DB] Dashboard '{name}' saved successfully.")
         return cursor.lastrowid
     except sqlite3.Error as e:
+        _rollback(conn)
         print(f"[DB ERROR] save_dashboard: {e}")
         return None
 
@@ -286,3 +305,85 @@ def load_dashboard(conn, dashboard_id):
     except sqlite3.Error as e:
         print(f"[DB ERROR] load_dashboard: {e}")
         return None
+
+
+# === COMMENTS, SHARES & HISTORY ===
+# These writes are not critical to the current click, so each accepts an optional
+# write_queue (write_queue.WriteBehindQueue). When given, the write is committed in
+# the background; call write_queue.wait_for(session_id) before reading it back.
+
+def _write(conn, query, params, label, write_queue=None, session_id=None):
+    if write_queue is not None:
+        write_queue.submit(query, params, session_id)
+        return
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        conn.commit()
+        print(f"[DB] {label} saved successfully.")
+    except sqlite3.Error as e:
+        _rollback(conn)
+        print(f"[DB ERROR] {label}: {e}")
+
+def add_comment(conn, element_id, user_id, comment_text, write_queue=None, session_id=None):
+    _write(conn, """
+        INSERT INTO comments (element_id, user_id, comment_text)
+        VALUES (?, ?, ?)
+    """, (element_id, user_id, comment_text), "Comment", write_queue, session_id)
+
+def get_element_comments(conn, element_id):
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT c.id, c.user_id, u.username, c.comment_text, c.created_at
+            FROM comments c
+            LEFT JOIN users u ON u.id = c.user_id
+            WHERE c.element_id = ?
+            ORDER BY c.created_at, c.id
+        """, (element_id,))
+        return cursor.fetchall()
+    except sqlite3.Error as e:
+        print(f"[DB ERROR] get_element_comments: {e}")
+        return []
+
+def share_dashboard(conn, dashboard_id, user_id, permission="view", write_queue=None, session_id=None):
+    _write(conn, """
+        INSERT OR REPLACE INTO dashboard_shares (dashboard_id, shared_with_user_id, permission)
+        VALUES (?, ?, ?)
+    """, (dashboard_id, user_id, permission), "Dashboard share", write_queue, session_id)
+
+def get_dashboard_shares(conn, dashboard_id):
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT s.shared_with_user_id, u.username, s.permission
+            FROM dashboard_shares s
+            LEFT JOIN users u ON u.id = s.shared_with_user_id
+            WHERE s.dashboard_id = ?
+        """, (dashboard_id,))
+        return cursor.fetchall()
+    except sqlite3.Error as e:
+        print(f"[DB ERROR] get_dashboard_shares: {e}")
+        return []
+
+def add_dashboard_history(conn, dashboard_id, snapshot, write_queue=None, session_id=None):
+    # The version number is computed inside the INSERT so queued writes stay ordered
+    _write(conn, """
+        INSERT INTO dashboard_history (dashboard_id, version_number, snapshot)
+        SELECT ?, COALESCE(MAX(version_number), 0) + 1, ?
+        FROM dashboard_history WHERE dashboard_id = ?
+    """, (dashboard_id, json.dumps(snapshot), dashboard_id), "Dashboard history", write_queue, session_id)
+
+def get_dashboard_history(conn, dashboard_id):
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, version_number, snapshot, updated_at
+            FROM dashboard_history
+            WHERE dashboard_id = ?
+            ORDER BY version_number DESC
+        """, (dashboard_id,))
+        return cursor.fetchall()
+    except sqlite3.Error as e:
+        print(f"[DB ERROR] get_dashboard_history: {e}")
+        return []
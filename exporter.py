@@ -0,0 +1,251 @@
+import gzip
+import os
+import secrets
+import tempfile
+import time
+
+# Exports are written chunk by chunk to a temp file, so peak memory is one chunk
+# rather than the whole file rendered as a string next to the DataFrame.
+
+DEFAULT_CHUNKSIZE = 50_000
+EXPORT_PREFIX = "datasage-export-"
+EXCEL_MAX_ROWS = 1_048_576
+
+EXPORT_FORMATS = {
+    "CSV": {"suffix": ".csv", "mime": "text/csv"},
+    "Parquet": {"suffix": ".parquet", "mime": "application/vnd.apache.parquet"},
+    "Excel": {"suffix": ".xlsx", "mime": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"},
+}
+
+# === CHUNK SOURCES ===
+
+# Every source yields at least one chunk, empty when there are no rows, so the
+# writers still see the columns and write the header / schema.
+
+def iter_frame_chunks(df, chunksize=DEFAULT_CHUNKSIZE):
+    # iloc slices are views, so this never copies the frame
+    for start in range(0, max(len(df), 1), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+def iter_cursor_chunks(cursor, chunksize=DEFAULT_CHUNKSIZE):
+    # Works with any DB-API cursor that has already executed a query
+    import pandas as pd
+
+    columns = [col[0] for col in cursor.description]
+    empty = True
+    while True:
+        rows = cursor.fetchmany(chunksize)
+        if not rows:
+            break
+        empty = False
+        yield pd.DataFrame.from_records(rows, columns=columns)
+    if empty:
+        yield pd.DataFrame(columns=columns)
+
+def iter_query_chunks(data_source, query, chunksize=DEFAULT_CHUNKSIZE):
+    # Stream straight from the database when the source exposes its connection;
+    # otherwise run the query once and slice the result
+    import pandas as pd
+
+    con = getattr(data_source, "engine", None) or getattr(data_source, "connection", None)
+    if con is not None:
+        # pandas yields one empty, column-bearing frame for a result with no rows
+        yield from pd.read_sql_query(query, con, chunksize=chunksize)
+    else:
+        yield from iter_frame_chunks(data_source.execute_query(query), chunksize)
+
+def iter_plan_chunks(chunks, plan):
+    # For chunks streamed from a database. Row-local plans are applied chunk by chunk;
+    # the rest need the whole result. An in-memory frame should instead be transformed
+    # once and passed to iter_frame_chunks, which avoids concatenating copies of it.
+    if plan is None or not len(plan):
+        yield from chunks
+    elif plan.streamable():
+        for chunk in chunks:
+            yield plan.execute(chunk)
+    else:
+        import pandas as pd
+
+        frames = list(chunks)
+        yield plan.execute(pd.concat(frames, ignore_index=True) if frames else pd.DataFrame())
+
+# === WRITERS ===
+
+def write_csv(chunks, path, compression=None, progress=None, total_rows=None):
+    opener = gzip.open if compression == "gzip" else open
+    rows = 0
+    with opener(path, "wt", newline="", encoding="utf-8") as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, header=(i == 0), index=False)
+            rows += len(chunk)
+            if progress:
+                progress(rows, total_rows)
+    return rows
+
+def _arrow_table(chunk):
+    import pyarrow as pa
+
+    try:
+        return pa.Table.from_pandas(chunk, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Object columns mixing types have no Arrow type; write their values as strings
+        chunk = chunk.copy()
+        for col in chunk.select_dtypes(include="object").columns:
+            chunk[col] = chunk[col].where(chunk[col].isna(), chunk[col].astype(str))
+        return pa.Table.from_pandas(chunk, preserve_index=False)
+
+def _unify_schema(current, incoming):
+    # Promote column by column (null -> any type, int -> float, ...); types with no
+    # common supertype, like int then str, become strings
+    import pyarrow as pa
+
+    fields = []
+    for field in current:
+        other = incoming.field(incoming.get_field_index(field.name))
+        try:
+            merged = pa.unify_schemas([pa.schema([field]), pa.schema([other])], promote_options="permissive")
+            fields.append(merged.field(0))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            fields.append(pa.field(field.name, pa.string()))
+    return pa.schema(fields)
+
+def _rewrite_parquet(writer, path, schema, compression):
+    # A Parquet file has one schema, so widening a type means copying the row groups
+    # written so far into a new file; this happens at most a few times per export
+    import pyarrow.parquet as pq
+
+    writer.close()
+    old_path = path + ".old"
+    os.replace(path, old_path)
+    new_writer = pq.ParquetWriter(path, schema, compression=compression)
+    try:
+        source = pq.ParquetFile(old_path)
+        for i in range(source.num_row_groups):
+            new_writer.write_table(source.read_row_group(i).cast(schema))
+    except Exception:
+        new_writer.close()
+        raise
+    finally:
+        os.remove(old_path)
+    print(f"[EXPORT] Widened Parquet schema after {source.metadata.num_rows} rows.")
+    return new_writer
+
+def write_parquet(chunks, path, compression=None, progress=None, total_rows=None):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    compression = compression or "snappy"
+    writer = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            table = _arrow_table(chunk)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression=compression)
+            elif not table.schema.equals(writer.schema):
+                # A chunk's inferred types can differ from the first one's (ints that
+                # gained NULLs, a column that was all NULL); widen instead of failing
+                schema = _unify_schema(writer.schema, table.schema)
+                if not schema.equals(writer.schema):
+                    writer = _rewrite_parquet(writer, path, schema, compression)
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+            if progress:
+                progress(rows, total_rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        pq.write_table(pa.table({}), path)
+    return rows
+
+def _excel_value(value):
+    import pandas as pd
+
+    if value is None:
+        return None
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value
+
+def write_xlsx(chunks, path, compression=None, progress=None, total_rows=None):
+    # openpyxl's write-only mode streams rows to disk; xlsx is already zip-compressed
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = None
+    sheet_rows = 0
+    rows = 0
+    header = None
+    for chunk in chunks:
+        if header is None:
+            header = [str(col) for col in chunk.columns]
+        for record in chunk.itertuples(index=False, name=None):
+            if sheet is None or sheet_rows >= EXCEL_MAX_ROWS:
+                # Excel caps a sheet at 1,048,576 rows; continue on a new one
+                sheet = workbook.create_sheet(f"Sheet{len(workbook.worksheets) + 1}")
+                sheet.append(header)
+                sheet_rows = 1
+            sheet.append([_excel_value(v) for v in record])
+            sheet_rows += 1
+        rows += len(chunk)
+        if progress:
+            progress(rows, total_rows)
+    if sheet is None:
+        sheet = workbook.create_sheet("Sheet1")
+        if header:
+            sheet.append(header)
+    workbook.save(path)
+    return rows
+
+WRITERS = {
+    "CSV": write_csv,
+    "Parquet": write_parquet,
+    "Excel": write_xlsx,
+}
+
+# === EXPORT ===
+
+def export_file_name(base_name, fmt, compression=None):
+    name = os.path.splitext(base_name)[0] + EXPORT_FORMATS[fmt]["suffix"]
+    if fmt == "CSV" and compression == "gzip":
+        name += ".gz"
+    return name
+
+def export_to_temp_file(chunks, fmt, compression=None, progress=None, total_rows=None, directory=None):
+    # Returns (path, rows_written); the caller owns the file and must remove it
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    suffix = export_file_name("export", fmt, compression)[len("export"):]
+    # The random token keeps names unguessable when the directory is served over HTTP
+    fd, path = tempfile.mkstemp(prefix=f"{EXPORT_PREFIX}{secrets.token_hex(16)}-", suffix=suffix, dir=directory)
+    os.close(fd)
+    try:
+        rows = WRITERS[fmt](chunks, path, compression=compression, progress=progress, total_rows=total_rows)
+    except Exception:
+        os.remove(path)
+        raise
+    print(f"[EXPORT] Wrote {rows} rows to {path} ({os.path.getsize(path)} bytes).")
+    return path, rows
+
+def prune_exports(directory, max_age):
+    # Files served from disk outlive the run that wrote them; remove the stale ones
+    if not os.path.isdir(directory):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if name.startswith(EXPORT_PREFIX) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError as e:
+            print(f"[EXPORT ERROR] Could not remove {path}: {e}")
+    return removed
@@ -2,14 +2,34 @@ import streamlit as st
 from db import *
 import os
 
-# Connect to SQLite DB
 DB_PATH = "datasage.db"
-conn = create_connection(DB_PATH)
-initialize_database(conn)
+CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "style.css")
 
-# Load CSS
-with open("style.css") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+# Create the tables once per process instead of on every script run
+@st.cache_resource
+def init_database():
+    conn = create_connection(DB_PATH)
+    initialize_database(conn)
+    conn.close()
+    return True
+
+# Read static assets once instead of on every script run
+@st.cache_resource
+def load_css():
+    with open(CSS_PATH) as f:
+        return f"<style>{f.read()}</style>"
+
+init_database()
+st.markdown(load_css(), unsafe_allow_html=True)
+
+# One connection per session: reused across its reruns, never shared between
+# sessions, whose concurrent commits would interleave on a shared connection
+if "conn" not in st.session_state:
+    st.session_state.conn = create_connection(DB_PATH)
+conn = st.session_state.conn
+# Nothing should still be open from an earlier run; never carry the write lock over
+if conn.in_transaction:
+    conn.rollback()
 
 # --- SESSION STATE INIT ---
 if "logged_in" not in st.session_state:
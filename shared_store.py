@@ -0,0 +1,281 @@
+import atexit
+import collections
+import contextlib
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import weakref
+
+# Datasets published here are written once as Arrow IPC files and memory-mapped by
+# every Streamlit process that needs them, so a popular upload is resident once per
+# host instead of once per process. Frames handed out are read-only views.
+
+DEFAULT_BUDGET_MB = 1024
+DEFAULT_REAP_INTERVAL = 5.0
+
+def default_store_root():
+    root = os.environ.get("DATASAGE_SHARED_STORE")
+    if root:
+        return root
+    # /dev/shm keeps the files in RAM on Linux; elsewhere fall back to the temp dir
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "datasage-datasets")
+
+def default_budget_bytes():
+    return int(float(os.environ.get("DATASAGE_SHARED_BUDGET_MB", DEFAULT_BUDGET_MB)) * 1024 * 1024)
+
+def dataset_key(name, raw_bytes):
+    # Content-addressed, so the same file uploaded in two processes maps to one entry
+    return f"{name}:{hashlib.sha256(raw_bytes).hexdigest()[:32]}"
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class SharedDatasetStore:
+    def __init__(self, root=None, budget_bytes=None, reap_interval=DEFAULT_REAP_INTERVAL):
+        self.root = root or default_store_root()
+        self.budget_bytes = budget_bytes if budget_bytes is not None else default_budget_bytes()
+        self.pid = os.getpid()
+        self._attached = {}
+        self._collected = collections.deque()
+        self._lock = threading.RLock()
+        os.makedirs(self.root, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(self.root, "index.db"), timeout=30,
+                                    check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self._create_tables()
+        # Releases references of collected frames even when this process makes no
+        # further store calls, so an idle process does not pin datasets forever
+        self._stop = threading.Event()
+        self._reaper = threading.Thread(target=self._reap_loop, args=(reap_interval,),
+                                        name="datasage-store-reaper", daemon=True)
+        self._reaper.start()
+        atexit.register(self.close)
+
+    # === INDEX ===
+
+    def _create_tables(self):
+        self.conn.executescript("""
+        CREATE TABLE IF NOT EXISTS datasets (
+            key TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            nbytes INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS dataset_refs (
+            key TEXT,
+            pid INTEGER,
+            PRIMARY KEY(key, pid),
+            FOREIGN KEY(key) REFERENCES datasets(key) ON DELETE CASCADE
+        );
+        """)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front so the index stays consistent
+        # when several processes publish or evict at the same time
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def _path_for(self, key):
+        return os.path.join(self.root, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".arrow")
+
+    # === PUBLISH / ATTACH ===
+
+    def publish(self, key, df):
+        # Returns a shared, read-only frame for key, or None when the dataset cannot be
+        # shared (does not fit the budget, or Arrow cannot represent it, e.g. an object
+        # column mixing numbers and strings); callers then keep their private copy
+        shared = self.attach(key)
+        if shared is not None:
+            return shared
+
+        path = self._path_for(key)
+        tmp_path = f"{path}.{self.pid}.tmp"
+        try:
+            import pyarrow as pa
+
+            table = pa.Table.from_pandas(df)
+            with pa.OSFile(tmp_path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            nbytes = os.path.getsize(tmp_path)
+            del table
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            print(f"[STORE ERROR] Could not publish '{key}': {e}")
+            return None
+
+        with self._lock, self._transaction() as conn:
+            row = conn.execute("SELECT path FROM datasets WHERE key=?", (key,)).fetchone()
+            if row is None:
+                if not self._make_room(conn, nbytes):
+                    os.remove(tmp_path)
+                    print(f"[STORE] '{key}' ({nbytes} bytes) does not fit the shared budget; keeping it private.")
+                    return None
+                os.replace(tmp_path, path)
+                now = time.time()
+                conn.execute("""
+                    INSERT INTO datasets (key, path, nbytes, created_at, last_access)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (key, path, nbytes, now, now))
+                print(f"[STORE] Published '{key}' ({nbytes} bytes).")
+            else:
+                # Another process won the race; use its copy
+                os.remove(tmp_path)
+        return self.attach(key)
+
+    def attach(self, key):
+        # Returns the shared frame for key, or None if no process has published it
+        with self._lock:
+            self._drop_collected_refs()
+            cached = self._attached.get(key)
+            if cached is not None and cached() is not None:
+                return cached()
+
+            with self._transaction() as conn:
+                row = conn.execute("SELECT path FROM datasets WHERE key=?", (key,)).fetchone()
+                if row is None:
+                    return None
+                # Taken before mapping so the file cannot be evicted underneath us
+                conn.execute("INSERT OR IGNORE INTO dataset_refs (key, pid) VALUES (?, ?)", (key, self.pid))
+                conn.execute("UPDATE datasets SET last_access=? WHERE key=?", (time.time(), key))
+
+            try:
+                import pyarrow as pa
+
+                # memory_map + read_all gives buffers that point straight into the page cache;
+                # numeric and datetime columns without nulls stay views on them in pandas
+                with pa.memory_map(row[0], "r") as source:
+                    table = pa.ipc.open_file(source).read_all()
+                df = table.to_pandas(split_blocks=True)
+            except Exception as e:
+                print(f"[STORE ERROR] Could not attach '{key}': {e}")
+                with self._transaction() as conn:
+                    conn.execute("DELETE FROM dataset_refs WHERE key=? AND pid=?", (key, self.pid))
+                return None
+
+            # The process keeps its reference for as long as the frame is alive: sessions
+            # hold it in session_state, and it is collected when the last one ends
+            self._attached[key] = weakref.ref(df)
+            weakref.finalize(df, self._collected.append, key)
+            return df
+
+    def _drop_collected_refs(self):
+        # Finalizers may fire on any thread mid-transaction, so they only queue the key;
+        # the index is updated here, under the lock
+        while self._collected:
+            key = self._collected.popleft()
+            cached = self._attached.get(key)
+            if cached is not None and cached() is not None:
+                continue  # re-attached since
+            self._attached.pop(key, None)
+            try:
+                with self._transaction() as conn:
+                    conn.execute("DELETE FROM dataset_refs WHERE key=? AND pid=?", (key, self.pid))
+            except sqlite3.Error:
+                self._collected.appendleft(key)  # retried on the next pass
+                raise
+
+    def _reap_loop(self, interval):
+        while not self._stop.wait(interval):
+            with self._lock:
+                if self.conn is None:
+                    return
+                try:
+                    self._drop_collected_refs()
+                except sqlite3.Error as e:
+                    print(f"[STORE ERROR] releasing references: {e}")
+
+    # === EVICTION ===
+
+    def _reap_dead_refs(self, conn):
+        pids = [row[0] for row in conn.execute("SELECT DISTINCT pid FROM dataset_refs")]
+        for pid in pids:
+            if pid != self.pid and not _pid_alive(pid):
+                conn.execute("DELETE FROM dataset_refs WHERE pid=?", (pid,))
+
+    def _make_room(self, conn, nbytes):
+        self._reap_dead_refs(conn)
+        used = conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM datasets").fetchone()[0]
+        if used + nbytes <= self.budget_bytes:
+            return True
+        candidates = conn.execute("""
+            SELECT d.key, d.path, d.nbytes FROM datasets d
+            WHERE NOT EXISTS (SELECT 1 FROM dataset_refs r WHERE r.key = d.key)
+            ORDER BY d.last_access
+        """).fetchall()
+        for key, path, size in candidates:
+            if used + nbytes <= self.budget_bytes:
+                break
+            self._evict(conn, key, path)
+            used -= size
+        return used + nbytes <= self.budget_bytes
+
+    def _evict(self, conn, key, path):
+        conn.execute("DELETE FROM datasets WHERE key=?", (key,))
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"[STORE ERROR] Could not remove {path}: {e}")
+        print(f"[STORE] Evicted '{key}'.")
+
+    def evict_unreferenced(self):
+        with self._lock:
+            self._drop_collected_refs()
+        with self._lock, self._transaction() as conn:
+            self._reap_dead_refs(conn)
+            rows = conn.execute("""
+                SELECT d.key, d.path FROM datasets d
+                WHERE NOT EXISTS (SELECT 1 FROM dataset_refs r WHERE r.key = d.key)
+            """).fetchall()
+            for key, path in rows:
+                self._evict(conn, key, path)
+        return len(rows)
+
+    # === INFO ===
+
+    def stats(self):
+        with self._lock:
+            rows = self.conn.execute("""
+                SELECT d.key, d.nbytes, COUNT(r.pid) FROM datasets d
+                LEFT JOIN dataset_refs r ON r.key = d.key
+                GROUP BY d.key ORDER BY d.last_access DESC
+            """).fetchall()
+        return {
+            "root": self.root,
+            "budget_bytes": self.budget_bytes,
+            "used_bytes": sum(row[1] for row in rows),
+            "datasets": [{"key": key, "nbytes": nbytes, "refcount": refs} for key, nbytes, refs in rows],
+        }
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            if self.conn is None:
+                return
+            try:
+                self.conn.execute("DELETE FROM dataset_refs WHERE pid=?", (self.pid,))
+            except sqlite3.Error as e:
+                print(f"[STORE ERROR] close: {e}")
+            self._attached.clear()
+            self._collected.clear()
+            self.conn.close()
+            self.conn = None
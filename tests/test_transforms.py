@@ -0,0 +1,88 @@
+import sqlite3
+
+import pytest
+
+from transforms import TransformPlan
+
+pd = pytest.importorskip("pandas")
+
+# Pushdown must not change results: every plan here runs once in pandas with
+# execute() and once against SQLite with run_on_database(), and both must agree.
+
+ROWS = [
+    {"region": "north", "amount": 1.0, "flag": True},
+    {"region": "North", "amount": 2.0, "flag": False},
+    {"region": "south", "amount": None, "flag": True},
+    {"region": None, "amount": 3.5, "flag": False},
+    {"region": "east", "amount": 2.0, "flag": True},
+    {"region": "50%_off", "amount": 4.0, "flag": False},
+]
+
+class SQLiteSource:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute_query(self, query):
+        return pd.read_sql_query(query, self.conn)
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame(ROWS)
+
+@pytest.fixture
+def source(frame):
+    conn = sqlite3.connect(":memory:")
+    frame.to_sql("sales", conn, index=False)
+    yield SQLiteSource(conn)
+    conn.close()
+
+def normalize(df):
+    # Same rows regardless of dtype (SQLite returns bools as ints) or row order
+    df = df.apply(lambda column: column.astype(int) if column.dtype == bool else column)
+    rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+    return sorted(rows, key=repr)
+
+FILTERS = [
+    ("region", "==", "north"),
+    ("region", "!=", "north"),
+    ("region", "==", None),
+    ("region", "!=", None),
+    ("region", "in", ["north", "east"]),
+    ("region", "in", ["north", None]),
+    ("region", "in", [None]),
+    ("region", "in", []),
+    ("region", "not in", ["north"]),
+    ("region", "not in", ["north", None]),
+    ("region", "not in", []),
+    ("region", "contains", "NOR"),
+    ("region", "contains", "%_"),
+    ("region", "contains", None),
+    ("region", "is null", None),
+    ("region", "not null", None),
+    ("amount", ">", 2),
+    ("amount", "<=", 3.5),
+    ("amount", "!=", 2.0),
+    ("amount", "<", None),
+    ("amount", "not in", [2.0]),
+    ("flag", "==", True),
+    ("flag", "!=", True),
+]
+
+@pytest.mark.parametrize("column,op,value", FILTERS)
+def test_filter_pushdown_matches_pandas(frame, source, column, op, value):
+    plan = TransformPlan().filter(column, op, value)
+    assert normalize(plan.run_on_database(source, "sales")) == normalize(plan.execute(frame))
+
+def test_pushdown_with_remaining_steps_matches_pandas(frame, source):
+    plan = (TransformPlan()
+            .filter("region", "not in", ["east"])
+            .select(["region", "amount"])
+            .group_aggregate(["region"], {"total": ["amount", "sum"]}))
+    where, _, remaining = plan.split_for_sql()
+    assert where and len(remaining) == 1
+    assert normalize(plan.run_on_database(source, "sales")) == normalize(plan.execute(frame))
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), [1.0, float("-inf")]])
+def test_non_finite_filter_values_are_rejected(value):
+    with pytest.raises(ValueError):
+        TransformPlan().filter("amount", "in" if isinstance(value, list) else ">", value)
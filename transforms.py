@@ -0,0 +1,365 @@
+import ast
+import json
+import math
+
+# A TransformPlan is a list of plain-dict steps. Building a plan does no work; the
+# data is only touched in execute() / run_on_database(), and the steps serialize
+# to JSON so dashboard elements can store the recipe instead of the data.
+
+PLAN_VERSION = 1
+
+FILTER_OPS = ["==", "!=", "<", "<=", ">", ">=", "in", "not in", "contains", "is null", "not null"]
+CAST_TYPES = ["int", "float", "str", "bool", "datetime", "category"]
+AGG_FUNCS = ["sum", "mean", "min", "max", "count", "nunique", "median"]
+
+# Steps that can be translated into the SELECT / WHERE of a database query
+PUSHDOWN_STEPS = ("filter", "select")
+
+# Steps whose output rows depend only on the matching input row, so a plan made of
+# them can run chunk by chunk
+ROW_LOCAL_STEPS = ("filter", "select", "derive", "cast", "fill_nulls", "drop_nulls")
+
+SQL_OPS = {"==": "=", "!=": "<>", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+# Per database type: identifier quoting, whether backslashes in literals are escapes
+# (MySQL), boolean literals, and the type used to compare any column as text
+SQL_DIALECTS = {
+    "sqlite": {"quote": '"', "backslash_escapes": False, "true": "1", "false": "0", "text": "TEXT"},
+    "postgresql": {"quote": '"', "backslash_escapes": False, "true": "TRUE", "false": "FALSE", "text": "TEXT"},
+    "mysql": {"quote": "`", "backslash_escapes": True, "true": "TRUE", "false": "FALSE", "text": "CHAR"},
+}
+
+class TransformPlan:
+    def __init__(self, steps=None):
+        self.steps = [dict(step) for step in (steps or [])]
+        for step in self.steps:
+            _validate_step(step)
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __repr__(self):
+        return f"TransformPlan({self.steps!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, TransformPlan) and self.steps == other.steps
+
+    def _then(self, **step):
+        return TransformPlan(self.steps + [step])
+
+    # === BUILDERS ===
+
+    def filter(self, column, op, value=None):
+        return self._then(op="filter", column=column, operator=op, value=value)
+
+    def select(self, columns):
+        return self._then(op="select", columns=list(columns))
+
+    def derive(self, name, expression):
+        return self._then(op="derive", name=name, expression=expression)
+
+    def cast(self, column, dtype):
+        return self._then(op="cast", column=column, dtype=dtype)
+
+    def fill_nulls(self, value, columns=None):
+        return self._then(op="fill_nulls", value=value, columns=list(columns) if columns else None)
+
+    def drop_nulls(self, columns=None):
+        return self._then(op="drop_nulls", columns=list(columns) if columns else None)
+
+    def dedupe(self, columns=None, keep="first"):
+        return self._then(op="dedupe", columns=list(columns) if columns else None, keep=keep)
+
+    def group_aggregate(self, by, aggregations):
+        # aggregations maps output column -> [source column, function]
+        return self._then(op="group_aggregate", by=list(by),
+                          aggregations={name: list(spec) for name, spec in aggregations.items()})
+
+    # === SERIALIZATION ===
+
+    def to_dict(self):
+        return {"version": PLAN_VERSION, "steps": self.steps}
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version", PLAN_VERSION) > PLAN_VERSION:
+            raise ValueError(f"Unsupported transform plan version: {data['version']}")
+        return cls(data.get("steps", []))
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    # === EXECUTION ===
+
+    def execute(self, df):
+        for step in self.steps:
+            df = STEP_EXECUTORS[step["op"]](df, step)
+        return df
+
+    def streamable(self):
+        return all(step["op"] in ROW_LOCAL_STEPS for step in self.steps)
+
+    def split_for_sql(self):
+        # Leading filters/selects run in the database; everything after the first other
+        # step runs in pandas. Returns (where_steps, projection, remaining_plan), where
+        # projection is None for SELECT *
+        prefix = 0
+        while prefix < len(self.steps) and self.steps[prefix]["op"] in PUSHDOWN_STEPS:
+            prefix += 1
+        pushed, rest = self.steps[:prefix], self.steps[prefix:]
+
+        projection = None
+        for step in pushed:
+            if step["op"] == "select":
+                projection = step["columns"]
+
+        # Projection pushdown: drop columns that nothing downstream reads
+        needed = _required_columns(rest)
+        if needed is not None:
+            if projection:
+                projection = [c for c in projection if c in needed] or projection
+            else:
+                projection = sorted(needed)
+
+        where = [step for step in pushed if step["op"] == "filter"]
+        return where, projection, TransformPlan(rest)
+
+    def to_sql(self, table, dialect="sqlite"):
+        sql = SQL_DIALECTS[dialect.lower()]
+        where, projection, remaining = self.split_for_sql()
+        columns = ", ".join(_quote_ident(c, sql) for c in projection) if projection else "*"
+        query = f"SELECT {columns} FROM {_quote_ident(table, sql)}"
+        if where:
+            query += " WHERE " + " AND ".join(_filter_sql(step, sql) for step in where)
+        return query, remaining
+
+    def run_on_database(self, data_source, table, dialect="sqlite"):
+        query, remaining = self.to_sql(table, dialect)
+        return remaining.execute(data_source.execute_query(query))
+
+# === VALIDATION ===
+
+def _validate_step(step):
+    op = step.get("op")
+    if op not in STEP_EXECUTORS:
+        raise ValueError(f"Unknown transform step: {op}")
+    if op == "filter" and step["operator"] not in FILTER_OPS:
+        raise ValueError(f"Unsupported filter operator: {step['operator']}")
+    if op == "filter":
+        values = step["value"] if isinstance(step["value"], list) else [step["value"]]
+        if any(isinstance(v, float) and not math.isfinite(v) for v in values):
+            # NaN/inf compare differently in pandas and SQL, and have no SQL literal
+            raise ValueError(f"Filter value must be a finite number: {step['value']}")
+    if op == "cast" and step["dtype"] not in CAST_TYPES:
+        raise ValueError(f"Unsupported cast type: {step['dtype']}")
+    if op == "dedupe" and step.get("keep", "first") not in ("first", "last", False):
+        raise ValueError(f"Unsupported dedupe keep: {step['keep']}")
+    if op == "group_aggregate":
+        for name, (column, func) in step["aggregations"].items():
+            if func not in AGG_FUNCS:
+                raise ValueError(f"Unsupported aggregation '{func}' for {name}")
+
+def expression_columns(expression):
+    # Names read by a derive expression, or None when they cannot be determined
+    # (pandas.eval also accepts `backtick quoted` names, which are not Python)
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError:
+        return None
+    functions = {id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call)}
+    return {node.id for node in ast.walk(tree) if isinstance(node, ast.Name) and id(node) not in functions}
+
+def _required_columns(steps):
+    # Walk backwards to find the input columns the steps read; None means "all of them"
+    needed = None
+    for step in reversed(steps):
+        op = step["op"]
+        if op == "select":
+            needed = set(step["columns"])
+        elif op == "group_aggregate":
+            needed = set(step["by"]) | {column for column, _ in step["aggregations"].values()}
+        elif needed is None:
+            continue
+        elif op == "derive":
+            columns = expression_columns(step["expression"])
+            if columns is None:
+                needed = None
+            else:
+                needed.discard(step["name"])
+                needed |= columns
+        elif op in ("filter", "cast"):
+            needed.add(step["column"])
+        elif op in ("drop_nulls", "dedupe"):
+            # Without an explicit subset these compare whole rows, so every column matters
+            if step.get("columns") is None:
+                needed = None
+            else:
+                needed |= set(step["columns"])
+    return needed
+
+# === PANDAS EXECUTORS ===
+
+# Filters use one null semantics in both executors: a null never equals or compares
+# to a value, so == / < / in drop null rows and != / not in keep them. None in an
+# "in" list matches nulls. The SQL translation spells this out since SQL would
+# drop NULL rows from <> and NOT IN.
+
+def _filter(df, step):
+    column = df[step["column"]]
+    op, value = step["operator"], step["value"]
+    if op == "is null" or (op == "==" and value is None):
+        mask = column.isna()
+    elif op == "not null" or (op == "!=" and value is None):
+        mask = column.notna()
+    elif value is None and op not in ("in", "not in"):
+        mask = column.isna() & column.notna()
+    elif op in ("in", "not in"):
+        values = [v for v in value if v is not None]
+        mask = column.isin(values) & column.notna()
+        if len(values) < len(value):
+            mask = mask | column.isna()
+        if op == "not in":
+            mask = ~mask
+    elif op == "contains":
+        # Case-insensitive; the SQL side compares LOWER(...) so every dialect agrees
+        mask = column.astype("string").str.contains(str(value), case=False, regex=False, na=False)
+    elif op == "==":
+        mask = column == value
+    elif op == "!=":
+        mask = column != value
+    elif op == "<":
+        mask = column < value
+    elif op == "<=":
+        mask = column <= value
+    elif op == ">":
+        mask = column > value
+    else:
+        mask = column >= value
+    return df[mask]
+
+def _select(df, step):
+    return df[step["columns"]]
+
+def _derive(df, step):
+    return df.assign(**{step["name"]: df.eval(step["expression"])})
+
+def _cast(df, step):
+    import pandas as pd
+
+    column, dtype = step["column"], step["dtype"]
+    values = df[column]
+    if dtype == "int":
+        values = pd.to_numeric(values, errors="coerce").round().astype("Int64")
+    elif dtype == "float":
+        values = pd.to_numeric(values, errors="coerce").astype("float64")
+    elif dtype == "str":
+        values = values.astype("string")
+    elif dtype == "bool":
+        values = values.astype("boolean")
+    elif dtype == "datetime":
+        values = pd.to_datetime(values, errors="coerce")
+    else:
+        values = values.astype("category")
+    return df.assign(**{column: values})
+
+def _fill_nulls(df, step):
+    if step.get("columns"):
+        return df.fillna({column: step["value"] for column in step["columns"]})
+    return df.fillna(step["value"])
+
+def _drop_nulls(df, step):
+    return df.dropna(subset=step.get("columns"))
+
+def _dedupe(df, step):
+    return df.drop_duplicates(subset=step.get("columns"), keep=step.get("keep", "first"))
+
+def _group_aggregate(df, step):
+    aggregations = {name: (column, func) for name, (column, func) in step["aggregations"].items()}
+    return df.groupby(step["by"], dropna=False, sort=True).agg(**aggregations).reset_index()
+
+STEP_EXECUTORS = {
+    "filter": _filter,
+    "select": _select,
+    "derive": _derive,
+    "cast": _cast,
+    "fill_nulls": _fill_nulls,
+    "drop_nulls": _drop_nulls,
+    "dedupe": _dedupe,
+    "group_aggregate": _group_aggregate,
+}
+
+# === SQL ===
+
+def _quote_ident(name, sql):
+    quote = sql["quote"]
+    return f"{quote}{str(name).replace(quote, quote * 2)}{quote}"
+
+def _sql_literal(value, sql):
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return sql["true"] if value else sql["false"]
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ValueError(f"No SQL literal for {value}")
+    if isinstance(value, (int, float)):
+        return repr(value)
+    text = str(value)
+    if sql["backslash_escapes"]:
+        text = text.replace("\\", "\\\\")
+    return "'" + text.replace("'", "''") + "'"
+
+def _filter_sql(step, sql):
+    column = _quote_ident(step["column"], sql)
+    op, value = step["operator"], step["value"]
+    if op == "is null":
+        return f"{column} IS NULL"
+    if op == "not null":
+        return f"{column} IS NOT NULL"
+    if op in ("in", "not in"):
+        values = [v for v in value if v is not None]
+        match_null = len(values) < len(value)
+        if values:
+            listed = f"{column} IN ({', '.join(_sql_literal(v, sql) for v in values)})"
+            if op == "in":
+                return f"({listed} OR {column} IS NULL)" if match_null else listed
+            listed = f"{column} NOT IN ({', '.join(_sql_literal(v, sql) for v in values)})"
+            return f"({listed} AND {column} IS NOT NULL)" if match_null else f"({listed} OR {column} IS NULL)"
+        if op == "in":
+            return f"{column} IS NULL" if match_null else "1 = 0"
+        return f"{column} IS NOT NULL" if match_null else "1 = 1"
+    if value is None:
+        # == None / != None test for nulls, other comparisons (and contains) match nothing
+        return f"{column} IS NULL" if op == "==" else f"{column} IS NOT NULL" if op == "!=" else "1 = 0"
+    if op == "contains":
+        # '!' as the LIKE escape behaves the same in every supported dialect; LOWER on
+        # both sides keeps it case-insensitive where LIKE is not (PostgreSQL)
+        pattern = str(value).lower().replace("!", "!!").replace("%", "!%").replace("_", "!_")
+        return (f"LOWER(CAST({column} AS {sql['text']})) LIKE "
+                f"{_sql_literal('%' + pattern + '%', sql)} ESCAPE '!'")
+    if op == "!=":
+        return f"({column} <> {_sql_literal(value, sql)} OR {column} IS NULL)"
+    return f"{column} {SQL_OPS[op]} {_sql_literal(value, sql)}"
+
+# === DASHBOARD ELEMENTS ===
+
+def plan_element_data(source_name, plan, table=None, dialect=None):
+    # Payload for dashboard_elements.element_data; replayed by replay_element()
+    data = {"source": source_name, "table": table, "plan": plan.to_dict()}
+    if dialect:
+        data["dialect"] = dialect.lower()
+    return data
+
+def replay_element(element_data, data_sources, dialect="sqlite"):
+    if isinstance(element_data, str):
+        element_data = json.loads(element_data)
+    plan = TransformPlan.from_dict(element_data.get("plan", {}))
+    data_source = data_sources.get(element_data["source"])
+    if data_source is None:
+        raise KeyError(f"Data source '{element_data['source']}' is not loaded")
+    if element_data.get("table"):
+        return plan.run_on_database(data_source, element_data["table"], element_data.get("dialect", dialect))
+    return plan.execute(data_source.data)
@@ -0,0 +1,212 @@
+import atexit
+import collections
+import queue
+import sqlite3
+import threading
+import time
+
+from db import create_connection
+
+# Non-critical writes (comments, shares, history) are handed to a background thread
+# that commits them in groups, so the Streamlit script thread never waits on fsync.
+# A session that needs to see its own writes calls wait_for(session_id) first.
+
+DEFAULT_MAX_PENDING = 10_000
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 0.05
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_RETRY_DELAY = 0.1
+MAX_ERRORS = 1000
+
+_STOP = object()
+
+def _is_busy(e):
+    # Another connection holds the write lock; worth retrying, unlike other errors
+    return isinstance(e, sqlite3.OperationalError) and ("locked" in str(e) or "busy" in str(e))
+
+def _rollback(conn):
+    try:
+        conn.rollback()
+    except sqlite3.Error:
+        pass
+
+class WriteBehindQueue:
+    def __init__(self, db_file, max_pending=DEFAULT_MAX_PENDING, batch_size=DEFAULT_BATCH_SIZE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, max_retries=DEFAULT_MAX_RETRIES,
+                 retry_delay=DEFAULT_RETRY_DELAY):
+        self.db_file = db_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        # (session_id, query, error) of the most recent failed writes
+        self.errors = collections.deque(maxlen=MAX_ERRORS)
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._session_failures = {}
+        self._closed = False
+        self._failed = None
+        self._thread = threading.Thread(target=self._run, name="datasage-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # === SUBMIT / WAIT ===
+
+    def submit(self, query, params=(), session_id=None, timeout=None):
+        # Blocks while the buffer is full (up to timeout, then raises queue.Full) so a
+        # stalled disk applies back-pressure instead of growing memory without bound
+        if self._closed:
+            raise RuntimeError("Write-behind queue is closed")
+        self._check_failed()
+        with self._cond:
+            self._pending[session_id] = self._pending.get(session_id, 0) + 1
+        try:
+            self._queue.put((query, params, session_id), timeout=timeout)
+        except queue.Full:
+            self._mark_done([session_id])
+            raise
+
+    def wait_for(self, session_id, timeout=None):
+        # Read-your-writes: True once everything this session submitted is committed.
+        # False on timeout, or when any of its writes since the last wait_for failed
+        # (those are in self.errors); the failures are reported once
+        with self._cond:
+            done = self._cond.wait_for(lambda: not self._pending.get(session_id) or self._failed is not None, timeout)
+            failures = self._session_failures.pop(session_id, 0) if done else 0
+        self._check_failed()
+        return done and not failures
+
+    def flush(self, timeout=None):
+        with self._cond:
+            done = self._cond.wait_for(lambda: not any(self._pending.values()) or self._failed is not None, timeout)
+        self._check_failed()
+        return done
+
+    def pending(self, session_id=None):
+        with self._cond:
+            if session_id is None:
+                return sum(self._pending.values())
+            return self._pending.get(session_id, 0)
+
+    def close(self, timeout=None):
+        # Flushes everything already submitted, then stops the writer thread
+        if self._closed:
+            return
+        self._closed = True
+        # Never block on a full queue once the writer thread is gone
+        while self._thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self._thread.join(timeout)
+
+    def _check_failed(self):
+        if self._failed is not None:
+            raise RuntimeError(f"Write-behind queue stopped: {self._failed}")
+
+    def _mark_done(self, session_ids, failed_ids=()):
+        with self._cond:
+            for session_id in session_ids:
+                self._pending[session_id] -= 1
+                if not self._pending[session_id]:
+                    del self._pending[session_id]
+            for session_id in failed_ids:
+                self._session_failures[session_id] = self._session_failures.get(session_id, 0) + 1
+            self._cond.notify_all()
+
+    # === WRITER THREAD ===
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        if batch[0] is _STOP:
+            return batch
+        # Group commit: keep collecting until the batch is full or the interval elapses
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item is _STOP:
+                break
+        return batch
+
+    def _execute_batch(self, conn, batch, failed):
+        cursor = conn.cursor()
+        for i, (query, params, session_id) in enumerate(batch):
+            if i in failed:
+                continue
+            try:
+                cursor.execute(query, params)
+            except Exception as e:
+                if _is_busy(e):
+                    raise
+                # Bad parameters (e.g. an int too large for SQLite raises OverflowError) fail
+                # only their own statement; the rest of the transaction still commits
+                print(f"[DB ERROR] write-behind ({session_id}): {e}")
+                failed[i] = str(e)
+
+    def _commit_batch(self, conn, batch):
+        # Returns the session id of every write in the batch that was not committed
+        failed = {}
+        attempt = 0
+        while conn is not None:
+            try:
+                self._execute_batch(conn, batch, failed)
+                conn.commit()
+                break
+            except Exception as e:
+                _rollback(conn)
+                if _is_busy(e) and attempt < self.max_retries:
+                    # The lock is temporary: back off and retry the whole batch
+                    delay = self.retry_delay * 2 ** attempt
+                    attempt += 1
+                    print(f"[DB] write-behind: database busy, retrying {len(batch)} writes in {delay:.2f}s")
+                    time.sleep(delay)
+                    continue
+                print(f"[DB ERROR] write-behind commit of {len(batch)} writes failed: {e}")
+                failed = {i: failed.get(i, str(e)) for i in range(len(batch))}
+                break
+        else:
+            failed = {i: "no database connection" for i in range(len(batch))}
+        for i, error in failed.items():
+            query, _, session_id = batch[i]
+            self.errors.append((session_id, query, error))
+        return [batch[i][2] for i in failed]
+
+    def _run(self):
+        conn = create_connection(self.db_file)
+        stopping = False
+        try:
+            while not stopping:
+                batch = self._next_batch()
+                if batch[-1] is _STOP:
+                    batch.pop()
+                    stopping = True
+                failed_ids = []
+                try:
+                    if batch:
+                        failed_ids = self._commit_batch(conn, batch)
+                except Exception as e:
+                    print(f"[DB ERROR] write-behind batch of {len(batch)} writes failed: {e}")
+                    self.errors.extend((session_id, query, str(e)) for query, _, session_id in batch)
+                    failed_ids = [session_id for _, _, session_id in batch]
+                finally:
+                    # Waiters are released whether or not the batch made it to disk;
+                    # wait_for tells them which
+                    self._mark_done([session_id for _, _, session_id in batch], failed_ids)
+        except BaseException as e:
+            # The thread is going away: fail submit/wait_for instead of letting them hang
+            with self._cond:
+                self._failed = str(e) or type(e).__name__
+                self._cond.notify_all()
+            raise
+        finally:
+            if conn is not None:
+                conn.close()
+        print("[DB] Write-behind queue flushed and stopped.")